@@ -10,23 +10,23 @@ ZONES = {
         "Adamawa": {"lat": 9.33, "lon": 12.38}
     },
     "North-Central": {
-        "Niger": {"lat": 9.62, "lon": 6.56},
-        "Kwara": {"lat": 8.97, "lon": 4.39},
-        "Benue": {"lat": 7.73, "lon": 8.54}
+        "Benue": {"lat": 7.73, "lon": 8.54},
+        "Plateau": {"lat": 9.93, "lon": 8.89},
+        "Niger": {"lat": 9.93, "lon": 6.54}
     },
     "South-West": {
-        "Oyo": {"lat": 7.84, "lon": 3.93},
-        "Osun": {"lat": 7.56, "lon": 4.52},
-        "Lagos": {"lat": 6.52, "lon": 3.38}
+        "Oyo": {"lat": 7.85, "lon": 3.93},
+        "Ogun": {"lat": 7.16, "lon": 3.35},
+        "Ondo": {"lat": 7.25, "lon": 5.19}
     },
     "South-East": {
-        "Enugu": {"lat": 6.45, "lon": 7.50},
-        "Anambra": {"lat": 6.22, "lon": 7.07},
-        "Imo": {"lat": 5.48, "lon": 7.03}
+        "Enugu": {"lat": 6.86, "lon": 7.39},
+        "Abia": {"lat": 5.45, "lon": 7.52},
+        "Ebonyi": {"lat": 6.27, "lon": 8.01}
     },
     "South-South": {
-        "Rivers": {"lat": 4.84, "lon": 7.01},
-        "Delta": {"lat": 5.53, "lon": 5.90},
-        "Akwa Ibom": {"lat": 5.04, "lon": 7.92}
+        "Rivers": {"lat": 4.82, "lon": 7.01},
+        "Delta": {"lat": 5.68, "lon": 5.92},
+        "Akwa Ibom": {"lat": 5.01, "lon": 7.85}
     }
 }
@@ -9,75 +9,103 @@ Date: 2024
 import pandas as pd
 import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import time
+import threading
+import os
 from pathlib import Path
 import sys
 import warnings
 import traceback
 import json
+import orjson
+import ijson
+import io
+import argparse
+import gzip
+import hashlib
+from dataclasses import dataclass, field
 
-# Suppress warnings
-warnings.filterwarnings('ignore')
+# Zones are shared with the rest of the project via config/zones.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config.zones import ZONES as ZONES_CONFIG
 
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
 
+@dataclass(frozen=True, slots=True)
 class Config:
-    """Configuration settings"""
+    """Configuration settings (read-only, shared safely across threads)"""
     
     # Directories
-    BASE_DIR = Path("project_data")
-    RAW_DATA_DIR = BASE_DIR / "raw_data"
-    CLIMATE_DIR = RAW_DATA_DIR / "climate"
-    AGRICULTURE_DIR = RAW_DATA_DIR / "agriculture"
-    SOIL_DIR = RAW_DATA_DIR / "soil"
+    BASE_DIR: Path = Path("project_data")
+    RAW_DATA_DIR: Path = BASE_DIR / "raw_data"
+    CLIMATE_DIR: Path = RAW_DATA_DIR / "climate"
+    CACHE_DIR: Path = CLIMATE_DIR / ".cache"  # Extracted NASA POWER series
+    AGRICULTURE_DIR: Path = RAW_DATA_DIR / "agriculture"
+    SOIL_DIR: Path = RAW_DATA_DIR / "soil"
     
     # Time period
-    START_YEAR = 1990
-    END_YEAR = 2023
+    START_YEAR: int = 1990
+    END_YEAR: int = 2023
     
-    # NASA POWER API - CORRECTED ENDPOINT for daily data
-    NASA_POWER_URL = "https://power.larc.nasa.gov/api/temporal/daily/point"
+    # NASA POWER API - REGIONAL endpoint for daily data
+    # One request covers a whole bounding box; states are picked from the grid
+    NASA_POWER_URL: str = "https://power.larc.nasa.gov/api/temporal/daily/regional"
+    
+    # Nigeria (~4°N-14°N, 2.5°E-14.5°E) split into tiles within the
+    # regional endpoint's 10 degree bounding box limit
+    REGION_TILES: tuple = (
+        {'latitude-min': 4.0, 'latitude-max': 14.0, 'longitude-min': 2.5, 'longitude-max': 8.5},
+        {'latitude-min': 4.0, 'latitude-max': 14.0, 'longitude-min': 8.5, 'longitude-max': 14.5},
+    )
+    
+    # NASA POWER download concurrency
+    MAX_WORKERS: int = 16           # Parallel (tile, parameter, chunk) requests in flight
+    REQUESTS_PER_SECOND: int = 5    # Stay under POWER rate limits (HTTP 422/429)
+    CHUNK_YEARS: int = 2            # 2-year chunks to avoid timeouts
     
     # Nigerian geopolitical zones with representative states and coordinates
-    ZONES = {
-        'North-West': {
-            'Kaduna': {'lat': 10.52, 'lon': 7.44},
-            'Kano': {'lat': 12.00, 'lon': 8.52},
-            'Sokoto': {'lat': 13.06, 'lon': 5.24}
-        },
-        'North-East': {
-            'Borno': {'lat': 11.85, 'lon': 13.09},
-            'Bauchi': {'lat': 10.31, 'lon': 9.84},
-            'Adamawa': {'lat': 9.33, 'lon': 12.38}
-        },
-        'North-Central': {
-            'Benue': {'lat': 7.73, 'lon': 8.54},
-            'Plateau': {'lat': 9.93, 'lon': 8.89},
-            'Niger': {'lat': 9.93, 'lon': 6.54}
-        },
-        'South-West': {
-            'Oyo': {'lat': 7.85, 'lon': 3.93},
-            'Ogun': {'lat': 7.16, 'lon': 3.35},
-            'Ondo': {'lat': 7.25, 'lon': 5.19}
-        },
-        'South-East': {
-            'Enugu': {'lat': 6.86, 'lon': 7.39},
-            'Abia': {'lat': 5.45, 'lon': 7.52},
-            'Ebonyi': {'lat': 6.27, 'lon': 8.01}
-        },
-        'South-South': {
-            'Rivers': {'lat': 4.82, 'lon': 7.01},
-            'Delta': {'lat': 5.68, 'lon': 5.92},
-            'Akwa Ibom': {'lat': 5.01, 'lon': 7.85}
-        }
-    }
+    ZONES: dict = field(default_factory=lambda: ZONES_CONFIG)
+
+CFG = Config()
+
+# Shared HTTP session: keep-alive connection pooling (one TLS handshake per
+# pooled connection) and automatic retries with exponential backoff
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(
+    pool_connections=CFG.MAX_WORKERS,
+    pool_maxsize=2 * CFG.MAX_WORKERS,
+    max_retries=Retry(total=3, backoff_factor=2,
+                      status_forcelist=[429, 500, 502, 503, 504])
+))
+
+class RateLimiter:
+    """Thread-safe limiter spacing request starts evenly over time"""
+    
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def wait(self):
+        """Block until the caller may issue its next request"""
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+NASA_RATE_LIMITER = RateLimiter(CFG.REQUESTS_PER_SECOND)
 
 def create_directories():
     """Create project directory structure"""
-    dirs = [Config.CLIMATE_DIR, Config.AGRICULTURE_DIR, Config.SOIL_DIR]
+    dirs = [CFG.CLIMATE_DIR, CFG.CACHE_DIR, CFG.AGRICULTURE_DIR, CFG.SOIL_DIR]
     for directory in dirs:
         directory.mkdir(parents=True, exist_ok=True)
     print("Directory structure created")
@@ -87,8 +115,8 @@ def print_header():
     print("\n" + "="*70)
     print("CLIMATE-FOOD SECURITY DATA DOWNLOAD SCRIPT")
     print("="*70)
-    print(f"Period: {Config.START_YEAR}-{Config.END_YEAR}")
-    print(f"Coverage: {len(Config.ZONES)} geopolitical zones, 18 states")
+    print(f"Period: {CFG.START_YEAR}-{CFG.END_YEAR}")
+    print(f"Coverage: {len(CFG.ZONES)} geopolitical zones, 18 states")
     print("\nData Sources:")
     print("  1. CO2: NOAA Global Monitoring Laboratory")
     print("  2. Temperature: NASA POWER API")
@@ -113,44 +141,32 @@ def download_co2_data():
     
     try:
         print("\nDownloading...", end=" ")
-        response = requests.get(url, timeout=30)
+        response = SESSION.get(url, timeout=30)
         response.raise_for_status()
         print("Done")
         
-        # Parse the text file
+        # Parse the text file (columns: year, month, decimal date, average, ...)
         print("Parsing data...", end=" ")
-        lines = response.text.split('\n')
-        data_lines = [line for line in lines if not line.startswith('#') and line.strip()]
-        
-        data = []
-        for line in data_lines:
-            parts = line.split()
-            if len(parts) >= 4:
-                try:
-                    year = int(parts[0])
-                    month = int(parts[1])
-                    co2_ppm = float(parts[3])
-                    
-                    if Config.START_YEAR <= year <= Config.END_YEAR:
-                        data.append({
-                            'Year': year,
-                            'Month': month,
-                            'CO2_ppm': co2_ppm
-                        })
-                except ValueError:
-                    continue
-        
-        df = pd.DataFrame(data)
+        df = pd.read_csv(
+            io.StringIO(response.text),
+            comment='#',
+            sep=r'\s+',
+            header=None,
+            usecols=[0, 1, 3],
+            engine='c'
+        )
+        df.columns = ['Year', 'Month', 'CO2_ppm']
+        df = df[df['Year'].between(CFG.START_YEAR, CFG.END_YEAR)].reset_index(drop=True)
         print("Done")
         
-        # Calculate growth rate
+        # Calculate growth rate (change from the same month one year earlier)
         print("Calculating CO2 growth rate...", end=" ")
-        df = df.sort_values(['Year', 'Month'])
-        df['CO2_Growth_Rate_ppm_per_year'] = df.groupby('Month')['CO2_ppm'].diff(12)
+        df = df.sort_values(['Year', 'Month'], ignore_index=True)
+        df['CO2_Growth_Rate_ppm_per_year'] = df['CO2_ppm'] - df['CO2_ppm'].shift(12)
         print("Done")
         
         # Save
-        output_file = Config.CLIMATE_DIR / "co2_data.csv"
+        output_file = CFG.CLIMATE_DIR / "co2_data.csv"
         df.to_csv(output_file, index=False)
         
         print(f"\nCO2 DATA DOWNLOADED SUCCESSFULLY")
@@ -174,10 +190,19 @@ def download_co2_data():
 # 2. NASA POWER DATA (Temperature, Rainfall, Humidity) - CORRECTED
 # ============================================================================
 
-def download_nasa_power_data(lat, lon, start_year, end_year, state_name):
+# Daily parameters requested from NASA POWER
+NASA_PARAMETERS = ['T2M', 'T2M_MAX', 'T2M_MIN', 'PRECTOTCORR', 'RH2M']
+
+def year_chunks(start_year, end_year, chunk_size):
+    """Split a year range into (year_start, year_end) chunks"""
+    return [
+        (year_start, min(year_start + chunk_size - 1, end_year))
+        for year_start in range(start_year, end_year + 1, chunk_size)
+    ]
+
+def fetch_chunk(tile, parameter, start_date, end_date, state_points):
     """
-    Download climate data from NASA POWER API using DAILY endpoint
-    Then aggregate to monthly data
+    Download one chunk of DAILY data for a bounding box from the NASA POWER API
     
     Daily Parameters:
     - T2M: Temperature at 2 Meters (°C)
@@ -185,207 +210,333 @@ def download_nasa_power_data(lat, lon, start_year, end_year, state_name):
     - T2M_MIN: Minimum Temperature (°C)
     - PRECTOTCORR: Precipitation Corrected (mm/day)
     - RH2M: Relative Humidity (%)
+    
+    The regional endpoint accepts a single parameter per request and
+    returns a GeoJSON FeatureCollection with one feature per grid cell.
+    The response is stream-parsed, keeping only the cells nearest to
+    state_points, an (n_states, 2) array of (lon, lat).
+    
+    Extracted series are cached on disk, so re-runs only download
+    chunks that are missing.
+    
+    Returns one {date: value} dict per state (same order as state_points),
+    or None if the request failed after the session's retries.
+    Safe to call from worker threads.
     """
+    params = {
+        'parameters': parameter,
+        'community': 'AG',
+        **tile,
+        'start': start_date,
+        'end': end_date,
+        'format': 'JSON'
+    }
     
-    # Parameters for daily data - using correct parameter names
-    parameters = ['T2M', 'T2M_MAX', 'T2M_MIN', 'PRECTOTCORR', 'RH2M']
-    
-    def try_request(start_date, end_date):
-        """Helper function to try a single request"""
-        params = {
-            'parameters': ','.join(parameters),
-            'community': 'AG',
-            'longitude': lon,
-            'latitude': lat,
-            'start': start_date,
-            'end': end_date,
-            'format': 'JSON'
-        }
-        
+    # Check the cache before downloading
+    key = hashlib.sha1(
+        f"{sorted(tile.items())}_{parameter}_{start_date}_{end_date}_{state_points.tolist()}".encode()
+    ).hexdigest()
+    cache_file = CFG.CACHE_DIR / f"{key}.json.gz"
+    if cache_file.exists():
         try:
-            response = requests.get(Config.NASA_POWER_URL, params=params, timeout=180)
-            
+            return orjson.loads(gzip.decompress(cache_file.read_bytes()))
+        except (OSError, EOFError, ValueError):
+            # Corrupt or truncated cache entry - drop it and download again
+            cache_file.unlink(missing_ok=True)
+    
+    NASA_RATE_LIMITER.wait()
+    
+    try:
+        with SESSION.get(CFG.NASA_POWER_URL, params=params, timeout=180, stream=True) as response:
             if response.status_code == 200:
-                return response.json()
+                response.raw.decode_content = True
+                series = nearest_cell_series(response.raw, parameter, state_points)
+                if series is None:
+                    print(f"    No grid cells returned ({parameter})")
+                    return None
+                # Write to a temp file and rename, so an interrupted run
+                # never leaves a truncated cache entry behind
+                tmp_file = CFG.CACHE_DIR / f"{key}.{threading.get_ident()}.tmp"
+                tmp_file.write_bytes(gzip.compress(orjson.dumps(series)))
+                os.replace(tmp_file, cache_file)
+                return series
             else:
                 # Try to get error details
                 try:
-                    error_data = response.json()
+                    error_data = orjson.loads(response.content)
                     if 'message' in error_data:
-                        print(f"    API Error: {error_data['message'][:100]}")
+                        print(f"    API Error ({parameter}): {error_data['message'][:100]}")
                     else:
-                        print(f"    HTTP {response.status_code}")
+                        print(f"    HTTP {response.status_code} ({parameter})")
                 except:
-                    print(f"    HTTP {response.status_code}")
-                return None
-                
-        except requests.exceptions.Timeout:
-            print(f"    Timeout for {state_name}")
-            return None
-        except requests.exceptions.RequestException as e:
-            print(f"    Request error: {str(e)}")
-            return None
-        except Exception as e:
-            print(f"    Unexpected error: {str(e)}")
-            return None
-
-    # Try 2-year chunks to avoid timeouts
-    print(f"    Downloading {state_name} ({lat}, {lon})...")
-    
-    all_data = {
-        'dates': [],
-        'temps_avg': [],
-        'temps_max': [],
-        'temps_min': [],
-        'rainfall': [],
-        'humidity': []
-    }
+                    print(f"    HTTP {response.status_code} ({parameter})")
+            
+    except requests.exceptions.Timeout:
+        print(f"    Timeout for {parameter} {start_date}-{end_date}")
+    except requests.exceptions.RequestException as e:
+        print(f"    Request error: {str(e)}")
+    except Exception as e:
+        print(f"    Unexpected error: {str(e)}")
     
-    chunk_size = 2  # 2-year chunks to be safe
-    all_chunks_successful = True
+    return None
+
+def nearest_cell_series(stream, parameter, state_points):
+    """
+    Pick the daily series of the grid cell nearest to each state
     
-    for year_start in range(start_year, end_year + 1, chunk_size):
-        year_end = min(year_start + chunk_size - 1, end_year)
-        
-        start_date = f"{year_start}0101"
-        end_date = f"{year_end}1231"
-        
-        print(f"    Chunk {year_start}-{year_end}...", end=" ")
-        
-        data = None
-        for attempt in range(3):  # Try up to 3 times per chunk
-            data = try_request(start_date, end_date)
-            if data is not None:
-                break
-            elif attempt < 2:
-                wait_time = (attempt + 1) * 10
-                print(f"Retry {attempt + 1} in {wait_time}s...", end=" ")
-                time.sleep(wait_time)
-        
-        if data is None:
-            print("FAILED")
-            all_chunks_successful = False
+    Features are parsed one at a time from the response stream, and only
+    the current nearest cell per state is kept, so the full payload is
+    never materialized. Returns one {date: value} dict per state, or
+    None if the payload had no grid cells.
+    """
+    best_dist = np.full(len(state_points), np.inf)
+    best_series = [None] * len(state_points)
+    
+    for feature in ijson.items(stream, 'features.item', use_float=True):
+        lon, lat = feature['geometry']['coordinates'][:2]
+        dist = (state_points[:, 0] - lon) ** 2 + (state_points[:, 1] - lat) ** 2
+        closer = dist < best_dist
+        if closer.any():
+            best_dist[closer] = dist[closer]
+            for i in np.flatnonzero(closer):
+                best_series[i] = feature['properties']['parameter'][parameter]
+    
+    if any(series is None for series in best_series):
+        return None
+    return best_series
+
+def aggregate_to_monthly(properties, state_name):
+    """Aggregate a state's daily {parameter: {date: value}} data to monthly data"""
+    # Flat table of daily records; YYYYMMDD keys and values are converted
+    # in bulk per parameter, then aligned on the parsed dates
+    columns = {}
+    for parameter in NASA_PARAMETERS:
+        series = properties.get(parameter, {})
+        raw_dates = np.fromiter(series.keys(), dtype='U8', count=len(series))
+        values = np.fromiter(series.values(), dtype=np.float32, count=len(series))
+        columns[parameter] = pd.Series(values, index=pd.to_datetime(raw_dates, format='%Y%m%d'))
+    
+    daily_df = pd.DataFrame(columns).dropna()
+    
+    if daily_df.empty:
+        print(f"    No data downloaded for {state_name}")
+        return None
+    
+    daily_df['heat_stress'] = daily_df['T2M_MAX'] > 35  # Days > 35°C
+    daily_df['cold_stress'] = daily_df['T2M_MIN'] < 15  # Days < 15°C
+    
+    # Month start of every day, truncated in one NumPy cast
+    month_keys = daily_df.index.values.astype('datetime64[M]').astype('datetime64[ns]')
+    
+    # Single vectorized daily -> monthly reduction
+    monthly = daily_df.groupby(pd.Index(month_keys, name='date')).agg(
+        Avg_Temp_C=('T2M', 'mean'),
+        Max_Temp_C=('T2M_MAX', 'max'),
+        Min_Temp_C=('T2M_MIN', 'min'),
+        Heat_Stress_Days=('heat_stress', 'sum'),
+        Cold_Stress_Days=('cold_stress', 'sum'),
+        Rainfall_mm=('PRECTOTCORR', 'sum'),
+        Max_Daily_Rainfall_mm=('PRECTOTCORR', 'max'),
+        Humidity_Percent=('RH2M', 'mean'),
+        Min_Humidity_Percent=('RH2M', 'min'),
+        Max_Humidity_Percent=('RH2M', 'max')
+    ).dropna().round({
+        'Avg_Temp_C': 2,
+        'Max_Temp_C': 2,
+        'Min_Temp_C': 2,
+        'Rainfall_mm': 1,
+        'Max_Daily_Rainfall_mm': 1,
+        'Humidity_Percent': 1,
+        'Min_Humidity_Percent': 1,
+        'Max_Humidity_Percent': 1
+    })
+    
+    # Date stays datetime64; it is only formatted as text for CSV export
+    return monthly.reset_index().rename(columns={'date': 'Date'})
+
+# Column dtypes of the monthly output tables (NASA POWER values are
+# single precision, so float32 halves memory without losing accuracy)
+META_SCHEMA = {
+    'Date': 'datetime64[ns]',
+    'Year': 'int64',
+    'Month': 'int64',
+    'Geopolitical_Zone': object,
+    'State': object
+}
+
+TEMPERATURE_SCHEMA = {
+    **META_SCHEMA,
+    'Avg_Temp_C': 'float32',
+    'Min_Temp_C': 'float32',
+    'Max_Temp_C': 'float32',
+    'Temp_Range_C': 'float32',
+    'Heat_Stress_Days': 'int64',
+    'Cold_Stress_Days': 'int64'
+}
+
+RAINFALL_SCHEMA = {
+    **META_SCHEMA,
+    'Rainfall_mm': 'float32',
+    'Rainy_Days': 'int64',
+    'Max_Daily_Rainfall_mm': 'float32',
+    'Rainfall_Intensity': 'float32',
+    'Drought_Index': 'float32',
+    'Flood_Risk_Index': 'float32'
+}
+
+HUMIDITY_SCHEMA = {
+    **META_SCHEMA,
+    'Avg_Humidity_Percent': 'float32',
+    'Min_Humidity_Percent': 'float32',
+    'Max_Humidity_Percent': 'float32'
+}
+
+def allocate_table(schema, n_rows):
+    """Preallocate one NumPy array per column for a table of n_rows"""
+    return {col: np.empty(n_rows, dtype=dtype) for col, dtype in schema.items()}
+
+def fill_rows(table, rows, df):
+    """Copy the columns of df into the rows slice of a preallocated table"""
+    for col in df.columns:
+        table[col][rows] = df[col].to_numpy()
+
+def table_to_frame(table, n_rows):
+    """Wrap the first n_rows of a preallocated table in a DataFrame"""
+    return pd.DataFrame({col: values[:n_rows] for col, values in table.items()}, copy=False)
+
+def print_api_warning():
+    """Print diagnostics when the NASA POWER API cannot be reached"""
+    print("\nWARNING: NASA POWER API request failed!")
+    print("   The script may not be able to download climate data.")
+    print("   Please check:")
+    print("   1. Your internet connection")
+    print("   2. NASA POWER API status (https://power.larc.nasa.gov/)")
+    print("   3. API parameters are correct")
+
+def download_all_chunks():
+    """
+    Download every (tile, parameter, chunk) request concurrently
+    
+    Returns {state: {parameter: {date: value}}} merged over all chunks.
+    Failed chunks are left out. Returns None if the first chunk fails and
+    the user chooses not to continue.
+    """
+    # Assign each state to the tile containing it
+    tile_states = [[] for _ in CFG.REGION_TILES]
+    for zone, states in CFG.ZONES.items():
+        for state, coords in states.items():
+            for i, tile in enumerate(CFG.REGION_TILES):
+                if (tile['latitude-min'] <= coords['lat'] <= tile['latitude-max'] and
+                        tile['longitude-min'] <= coords['lon'] <= tile['longitude-max']):
+                    tile_states[i].append((state, coords))
+                    break
+    
+    tasks = []
+    for i, states in enumerate(tile_states):
+        if not states:
             continue
+        for parameter in NASA_PARAMETERS:
+            for year_start, year_end in year_chunks(CFG.START_YEAR, CFG.END_YEAR,
+                                                    CFG.CHUNK_YEARS):
+                tasks.append((i, parameter, year_start, year_end))
+    
+    print(f"Submitting {len(tasks)} regional chunk requests "
+          f"({CFG.MAX_WORKERS} workers, {CFG.REQUESTS_PER_SECOND} req/s)\n")
+    
+    tile_points = [
+        np.array([[coords['lon'], coords['lat']] for _, coords in states])
+        for states in tile_states
+    ]
+    
+    state_properties = {}
+    
+    def submit(executor, task):
+        i, parameter, year_start, year_end = task
+        return executor.submit(fetch_chunk, CFG.REGION_TILES[i], parameter,
+                               f"{year_start}0101", f"{year_end}1231", tile_points[i])
+    
+    def record(completed, task, series):
+        i, parameter, year_start, year_end = task
+        status = "DONE" if series is not None else "FAILED"
+        print(f"  [{completed}/{len(tasks)}] Tile {i + 1} {parameter:12s} "
+              f"{year_start}-{year_end} {status}")
         
-        # Process the chunk data
+        if series is not None:
+            for (state, _), values in zip(tile_states[i], series):
+                state_properties.setdefault(state, {}).setdefault(parameter, {}).update(values)
+    
+    with ThreadPoolExecutor(max_workers=CFG.MAX_WORKERS) as executor:
         try:
-            properties = data.get('properties', {}).get('parameter', {})
+            # The first real download doubles as the API connectivity check
+            series = submit(executor, tasks[0]).result()
+            record(1, tasks[0], series)
             
-            # Extract daily data
-            if 'T2M' in properties:
-                for date_str, temp_avg in properties['T2M'].items():
-                    try:
-                        year = int(date_str[:4])
-                        month = int(date_str[4:6])
-                        day = int(date_str[6:8])
-                        
-                        # Create date object
-                        date_obj = datetime(year, month, day)
-                        date_key = f"{year}-{month:02d}-01"  # Monthly aggregation key
-                        
-                        if date_key not in all_data['dates']:
-                            all_data['dates'].append(date_key)
-                            all_data['temps_avg'].append([])
-                            all_data['temps_max'].append([])
-                            all_data['temps_min'].append([])
-                            all_data['rainfall'].append([])
-                            all_data['humidity'].append([])
-                        
-                        idx = all_data['dates'].index(date_key)
-                        
-                        # Add daily values
-                        all_data['temps_avg'][idx].append(temp_avg)
-                        all_data['temps_max'][idx].append(properties['T2M_MAX'][date_str])
-                        all_data['temps_min'][idx].append(properties['T2M_MIN'][date_str])
-                        all_data['rainfall'][idx].append(properties['PRECTOTCORR'][date_str])
-                        all_data['humidity'][idx].append(properties['RH2M'][date_str])
-                        
-                    except (KeyError, ValueError, IndexError) as e:
-                        continue
+            if series is None:
+                print_api_warning()
+                proceed = input("\nDo you want to continue anyway? (yes/no): ")
+                if proceed.lower() != 'yes':
+                    return None
             
-            print("DONE")
+            futures = {submit(executor, task): task for task in tasks[1:]}
             
-        except Exception as e:
-            print(f"Processing error: {str(e)}")
-            all_chunks_successful = False
-            continue
-        
-        # Be nice to the API
-        time.sleep(1)
+            for completed, future in enumerate(as_completed(futures), 2):
+                record(completed, futures[future], future.result())
+        except BaseException:
+            # On Ctrl-C, drop queued requests instead of waiting for all of them
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+    
+    return state_properties
+
+def save_climate_table(df, name, write_csv=False):
+    """
+    Save a monthly climate table as Parquet (typed, columnar, snappy)
     
-    if not all_data['dates']:
-        print(f"    No data downloaded for {state_name}")
-        return None
+    Optionally also writes the legacy CSV export next to it.
+    Returns the Parquet file path.
+    """
+    df['Geopolitical_Zone'] = df['Geopolitical_Zone'].astype('category')
+    df['State'] = df['State'].astype('category')
     
-    # Aggregate daily data to monthly
-    print(f"    Aggregating to monthly data...", end=" ")
+    output_file = CFG.CLIMATE_DIR / f"{name}.parquet"
+    df.to_parquet(output_file, compression='snappy', engine='pyarrow', index=False)
     
-    monthly_data = []
+    if write_csv:
+        df.to_csv(CFG.CLIMATE_DIR / f"{name}.csv", index=False, date_format='%Y-%m-%d')
     
-    for i, month_key in enumerate(all_data['dates']):
-        if (all_data['temps_avg'][i] and all_data['temps_max'][i] and 
-            all_data['temps_min'][i] and all_data['rainfall'][i] and 
-            all_data['humidity'][i]):
-            
-            # Calculate monthly averages
-            avg_temp = np.mean(all_data['temps_avg'][i])
-            max_temp = np.max(all_data['temps_max'][i])
-            min_temp = np.min(all_data['temps_min'][i])
-            
-            # Sum rainfall for the month
-            total_rainfall = np.sum(all_data['rainfall'][i])
-            
-            # Average humidity
-            avg_humidity = np.mean(all_data['humidity'][i])
-            
-            monthly_data.append({
-                'Date': month_key,
-                'Avg_Temp_C': round(avg_temp, 2),
-                'Max_Temp_C': round(max_temp, 2),
-                'Min_Temp_C': round(min_temp, 2),
-                'Rainfall_mm': round(total_rainfall, 1),
-                'Humidity_Percent': round(avg_humidity, 1)
-            })
-    
-    df = pd.DataFrame(monthly_data)
-    
-    # Sort by date
-    df['Date'] = pd.to_datetime(df['Date'])
-    df = df.sort_values('Date')
-    df['Date'] = df['Date'].dt.strftime('%Y-%m-%d')
-    
-    print("DONE")
-    
-    if len(df) > 0:
-        print(f"    Downloaded {len(df)} months of data for {state_name}")
-        return df
-    else:
-        print(f"    No valid monthly data for {state_name}")
-        return None
+    return output_file
 
-def collect_all_nasa_climate_data():
-    """Collect climate data from NASA POWER for all states"""
+def collect_all_nasa_climate_data(write_csv=False):
+    """Collect climate data from NASA POWER for all states (None if aborted)"""
     print("\n" + "="*70)
     print("STEP 2-4: DOWNLOADING CLIMATE DATA FROM NASA POWER")
     print("="*70)
     print("Source: NASA Langley Research Center")
     print("API: https://power.larc.nasa.gov/")
     print("\nNOTE: Using DAILY data aggregated to MONTHLY")
-    print("This will take approximately 20-30 minutes...")
-    print("Please be patient - downloading data for 18 states\n")
+    print("Downloading data for 18 states in parallel...")
     print("="*70 + "\n")
     
-    all_temperature_data = []
-    all_rainfall_data = []
-    all_humidity_data = []
+    total_states = sum(len(states) for states in CFG.ZONES.values())
+    
+    # Every state yields at most one row per month - fill preallocated
+    # column arrays in place instead of concatenating per-state frames
+    capacity = total_states * 12 * (CFG.END_YEAR - CFG.START_YEAR + 1)
+    temp_table = allocate_table(TEMPERATURE_SCHEMA, capacity)
+    rain_table = allocate_table(RAINFALL_SCHEMA, capacity)
+    humid_table = allocate_table(HUMIDITY_SCHEMA, capacity)
+    n_rows = 0
     
-    total_states = sum(len(states) for states in Config.ZONES.values())
     current_state = 0
     failed_states = []
     
     start_time = time.time()
     
-    for zone, states in Config.ZONES.items():
+    state_properties = download_all_chunks()
+    if state_properties is None:
+        return None
+    
+    for zone, states in CFG.ZONES.items():
         print(f"\n{zone}:")
         print("-" * 70)
         
@@ -395,96 +546,97 @@ def collect_all_nasa_climate_data():
             print(f"[{current_state}/{total_states}] {state:15s} ", end="")
             sys.stdout.flush()
             
-            df = download_nasa_power_data(
-                coords['lat'],
-                coords['lon'],
-                Config.START_YEAR,
-                Config.END_YEAR,
-                state
-            )
+            df = aggregate_to_monthly(state_properties.get(state, {}), state)
             
             if df is not None and len(df) > 0:
-                # Add metadata
-                df['Geopolitical_Zone'] = zone
-                df['State'] = state
-                df['Year'] = pd.to_datetime(df['Date']).dt.year
-                df['Month'] = pd.to_datetime(df['Date']).dt.month
+                rows = slice(n_rows, n_rows + len(df))
+                
+                # Shared metadata columns (zone and state broadcast)
+                dt = df['Date'].dt
+                meta = {
+                    'Date': df['Date'].values,
+                    'Year': dt.year.values,
+                    'Month': dt.month.values,
+                    'Geopolitical_Zone': zone,
+                    'State': state
+                }
                 
                 # Process Temperature data
-                temp_df = df[['Date', 'Year', 'Month', 'Geopolitical_Zone', 'State', 
-                             'Avg_Temp_C', 'Min_Temp_C', 'Max_Temp_C']].copy()
+                temp_df = pd.DataFrame({
+                    **meta,
+                    'Avg_Temp_C': df['Avg_Temp_C'].values,
+                    'Min_Temp_C': df['Min_Temp_C'].values,
+                    'Max_Temp_C': df['Max_Temp_C'].values
+                }, copy=False)
                 temp_df['Temp_Range_C'] = (temp_df['Max_Temp_C'] - temp_df['Min_Temp_C']).round(1)
-                temp_df['Heat_Stress_Days'] = (temp_df['Max_Temp_C'] > 35).astype(int) * \
-                                              np.random.randint(0, 10, len(temp_df))
-                temp_df['Cold_Stress_Days'] = 0
-                all_temperature_data.append(temp_df)
+                temp_df['Heat_Stress_Days'] = df['Heat_Stress_Days'].values
+                temp_df['Cold_Stress_Days'] = df['Cold_Stress_Days'].values
+                fill_rows(temp_table, rows, temp_df)
                 
                 # Process Rainfall data
-                rain_df = df[['Date', 'Year', 'Month', 'Geopolitical_Zone', 'State', 
-                             'Rainfall_mm']].copy()
+                rain_df = pd.DataFrame({
+                    **meta,
+                    'Rainfall_mm': df['Rainfall_mm'].values
+                }, copy=False)
                 rain_df['Rainfall_mm'] = rain_df['Rainfall_mm'].round(1)
                 rain_df['Rainy_Days'] = (rain_df['Rainfall_mm'] / 5).clip(0, 30).round().astype(int)
-                rain_df['Max_Daily_Rainfall_mm'] = (rain_df['Rainfall_mm'] * 
-                                                     np.random.uniform(0.3, 0.5, len(rain_df))).round(1)
+                rain_df['Max_Daily_Rainfall_mm'] = df['Max_Daily_Rainfall_mm'].values
                 rain_df['Rainfall_Intensity'] = (rain_df['Rainfall_mm'] / 
                                                   rain_df['Rainy_Days'].replace(0, 1)).round(2)
-                
-                # Calculate drought and flood indices
-                expected_rainfall = rain_df.groupby(['State', 'Month'])['Rainfall_mm'].transform('mean')
-                rain_df['Drought_Index'] = (1 - (rain_df['Rainfall_mm'] / expected_rainfall.replace(0, 1))).clip(0, 1).round(3)
-                rain_df['Flood_Risk_Index'] = (
-                    (rain_df['Max_Daily_Rainfall_mm'] / rain_df['Rainfall_mm'].replace(0, 1)) * 
-                    (rain_df['Rainfall_mm'] / expected_rainfall.replace(0, 1))
-                ).clip(0, 1).round(3)
-                
-                all_rainfall_data.append(rain_df)
+                # Drought and flood indices are filled in once all states are in
+                fill_rows(rain_table, rows, rain_df)
                 
                 # Process Humidity data
-                humid_df = df[['Date', 'Year', 'Month', 'Geopolitical_Zone', 'State', 
-                              'Humidity_Percent']].copy()
-                humid_df['Humidity_Percent'] = humid_df['Humidity_Percent'].round(1)
-                humid_df['Min_Humidity_Percent'] = (humid_df['Humidity_Percent'] - 
-                                                     np.random.uniform(10, 20, len(humid_df))).round(1)
-                humid_df['Max_Humidity_Percent'] = (humid_df['Humidity_Percent'] + 
-                                                     np.random.uniform(10, 20, len(humid_df))).round(1)
-                humid_df = humid_df.rename(columns={'Humidity_Percent': 'Avg_Humidity_Percent'})
-                all_humidity_data.append(humid_df)
+                humid_df = pd.DataFrame({
+                    **meta,
+                    'Avg_Humidity_Percent': df['Humidity_Percent'].values,
+                    'Min_Humidity_Percent': df['Min_Humidity_Percent'].values,
+                    'Max_Humidity_Percent': df['Max_Humidity_Percent'].values
+                }, copy=False)
+                fill_rows(humid_table, rows, humid_df)
                 
-                print("DONE")
+                n_rows += len(df)
+                print(f"DONE ({len(df)} months)")
             else:
                 print("FAILED")
                 failed_states.append(state)
-            
-            # Rate limiting
-            time.sleep(3)
     
     elapsed_time = time.time() - start_time
     
     # Combine and save data
-    if all_temperature_data:
+    if n_rows:
         print("\n" + "="*70)
         print("SAVING CLIMATE DATA FILES")
         print("="*70)
         
         # Temperature
         print("\n1. Temperature data...", end=" ")
-        temp_full = pd.concat(all_temperature_data, ignore_index=True)
-        temp_file = Config.CLIMATE_DIR / "temperature_data.csv"
-        temp_full.to_csv(temp_file, index=False)
+        temp_full = table_to_frame(temp_table, n_rows)
+        save_climate_table(temp_full, "temperature_data", write_csv)
         print(f"Saved ({len(temp_full):,} records)")
         
         # Rainfall
         print("2. Rainfall data...", end=" ")
-        rain_full = pd.concat(all_rainfall_data, ignore_index=True)
-        rain_file = Config.CLIMATE_DIR / "rainfall_data.csv"
-        rain_full.to_csv(rain_file, index=False)
+        rain_full = table_to_frame(rain_table, n_rows)
+        
+        # Drought and flood indices against each state's monthly climatology,
+        # computed in one grouped pass over all states
+        expected_rainfall = rain_full.groupby(['State', 'Month'])['Rainfall_mm'] \
+                                     .transform('mean').replace(0, 1)
+        rain_ratio = rain_full['Rainfall_mm'] / expected_rainfall
+        rain_full['Drought_Index'] = (1 - rain_ratio).clip(0, 1).round(3)
+        rain_full['Flood_Risk_Index'] = (
+            (rain_full['Max_Daily_Rainfall_mm'] / rain_full['Rainfall_mm'].replace(0, 1)) * 
+            rain_ratio
+        ).clip(0, 1).round(3)
+        
+        save_climate_table(rain_full, "rainfall_data", write_csv)
         print(f"Saved ({len(rain_full):,} records)")
         
         # Humidity
         print("3. Humidity data...", end=" ")
-        humid_full = pd.concat(all_humidity_data, ignore_index=True)
-        humid_file = Config.CLIMATE_DIR / "humidity_data.csv"
-        humid_full.to_csv(humid_file, index=False)
+        humid_full = table_to_frame(humid_table, n_rows)
+        save_climate_table(humid_full, "humidity_data", write_csv)
         print(f"Saved ({len(humid_full):,} records)")
         
         print(f"\nCLIMATE DATA DOWNLOADED SUCCESSFULLY")
@@ -557,7 +709,7 @@ TROUBLESHOOTING:
     print(instructions)
     
     # Create a placeholder file
-    placeholder_path = Config.AGRICULTURE_DIR / "README_FAO_DOWNLOAD.txt"
+    placeholder_path = CFG.AGRICULTURE_DIR / "README_FAO_DOWNLOAD.txt"
     with open(placeholder_path, 'w', encoding='utf-8') as f:
         f.write(instructions)
     
@@ -579,8 +731,8 @@ def create_summary_report(co2_df, temp_df, rain_df, humid_df):
     summary_parts = []
     summary_parts.append("\nDOWNLOAD SUMMARY REPORT")
     summary_parts.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    summary_parts.append(f"Period: {Config.START_YEAR}-{Config.END_YEAR}")
-    summary_parts.append(f"Coverage: {len(Config.ZONES)} zones, 18 states\n")
+    summary_parts.append(f"Period: {CFG.START_YEAR}-{CFG.END_YEAR}")
+    summary_parts.append(f"Coverage: {len(CFG.ZONES)} zones, 18 states\n")
     
     summary_parts.append("="*70)
     summary_parts.append("DOWNLOADED DATA FILES:")
@@ -604,7 +756,7 @@ def create_summary_report(co2_df, temp_df, rain_df, humid_df):
     # Temperature Data
     if temp_df is not None:
         summary_parts.append(f"\n{check_mark} TEMPERATURE DATA (NASA POWER)")
-        summary_parts.append(f"   File: climate/temperature_data.csv")
+        summary_parts.append(f"   File: climate/temperature_data.parquet")
         summary_parts.append(f"   Records: {len(temp_df):,}")
         summary_parts.append(f"   States: {temp_df['State'].nunique()}")
         summary_parts.append(f"   Avg Temp Range: {temp_df['Avg_Temp_C'].min():.1f}C - {temp_df['Avg_Temp_C'].max():.1f}C")
@@ -614,7 +766,7 @@ def create_summary_report(co2_df, temp_df, rain_df, humid_df):
     # Rainfall Data
     if rain_df is not None:
         summary_parts.append(f"\n{check_mark} RAINFALL DATA (NASA POWER)")
-        summary_parts.append(f"   File: climate/rainfall_data.csv")
+        summary_parts.append(f"   File: climate/rainfall_data.parquet")
         summary_parts.append(f"   Records: {len(rain_df):,}")
         summary_parts.append(f"   States: {rain_df['State'].nunique()}")
         summary_parts.append(f"   Rainfall Range: {rain_df['Rainfall_mm'].min():.1f}mm - {rain_df['Rainfall_mm'].max():.1f}mm")
@@ -624,7 +776,7 @@ def create_summary_report(co2_df, temp_df, rain_df, humid_df):
     # Humidity Data
     if humid_df is not None:
         summary_parts.append(f"\n{check_mark} HUMIDITY DATA (NASA POWER)")
-        summary_parts.append(f"   File: climate/humidity_data.csv")
+        summary_parts.append(f"   File: climate/humidity_data.parquet")
         summary_parts.append(f"   Records: {len(humid_df):,}")
         summary_parts.append(f"   States: {humid_df['State'].nunique()}")
         summary_parts.append(f"   Humidity Range: {humid_df['Avg_Humidity_Percent'].min():.1f}% - {humid_df['Avg_Humidity_Percent'].max():.1f}%")
@@ -649,7 +801,7 @@ def create_summary_report(co2_df, temp_df, rain_df, humid_df):
     print_pretty_summary(co2_df, temp_df, rain_df, humid_df)
     
     # Save ASCII version to file
-    summary_file = Config.BASE_DIR / "DOWNLOAD_SUMMARY.txt"
+    summary_file = CFG.BASE_DIR / "DOWNLOAD_SUMMARY.txt"
     with open(summary_file, 'w', encoding='utf-8') as f:
         f.write(summary_text)
     
@@ -661,8 +813,8 @@ def print_pretty_summary(co2_df, temp_df, rain_df, humid_df):
     """Print pretty summary to console with symbols"""
     print("\nDOWNLOAD SUMMARY REPORT")
     print(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"Period: {Config.START_YEAR}-{Config.END_YEAR}")
-    print(f"Coverage: {len(Config.ZONES)} zones, 18 states\n")
+    print(f"Period: {CFG.START_YEAR}-{CFG.END_YEAR}")
+    print(f"Coverage: {len(CFG.ZONES)} zones, 18 states\n")
     
     print("="*70)
     print("DOWNLOADED DATA FILES:")
@@ -681,7 +833,7 @@ def print_pretty_summary(co2_df, temp_df, rain_df, humid_df):
     # Temperature Data
     if temp_df is not None:
         print(f"\n✓ TEMPERATURE DATA (NASA POWER)")
-        print(f"   File: climate/temperature_data.csv")
+        print(f"   File: climate/temperature_data.parquet")
         print(f"   Records: {len(temp_df):,}")
         print(f"   States: {temp_df['State'].nunique()}")
         print(f"   Avg Temp Range: {temp_df['Avg_Temp_C'].min():.1f}°C - {temp_df['Avg_Temp_C'].max():.1f}°C")
@@ -691,7 +843,7 @@ def print_pretty_summary(co2_df, temp_df, rain_df, humid_df):
     # Rainfall Data
     if rain_df is not None:
         print(f"\n✓ RAINFALL DATA (NASA POWER)")
-        print(f"   File: climate/rainfall_data.csv")
+        print(f"   File: climate/rainfall_data.parquet")
         print(f"   Records: {len(rain_df):,}")
         print(f"   States: {rain_df['State'].nunique()}")
         print(f"   Rainfall Range: {rain_df['Rainfall_mm'].min():.1f}mm - {rain_df['Rainfall_mm'].max():.1f}mm")
@@ -701,7 +853,7 @@ def print_pretty_summary(co2_df, temp_df, rain_df, humid_df):
     # Humidity Data
     if humid_df is not None:
         print(f"\n✓ HUMIDITY DATA (NASA POWER)")
-        print(f"   File: climate/humidity_data.csv")
+        print(f"   File: climate/humidity_data.parquet")
         print(f"   Records: {len(humid_df):,}")
         print(f"   States: {humid_df['State'].nunique()}")
         print(f"   Humidity Range: {humid_df['Avg_Humidity_Percent'].min():.1f}% - {humid_df['Avg_Humidity_Percent'].max():.1f}%")
@@ -720,86 +872,19 @@ def print_pretty_summary(co2_df, temp_df, rain_df, humid_df):
     print("2. Run data preprocessing script to create master datasets")
     print("3. Begin model training with FNN, LSTM, and Hybrid models")
 
-# ============================================================================
-# 5. ALTERNATIVE: SIMPLE TEST FUNCTION
-# ============================================================================
-
-def test_nasa_api():
-    """Test NASA POWER API with a simple request"""
-    print("\n" + "="*70)
-    print("TESTING NASA POWER API")
-    print("="*70)
-    
-    # Test with Kaduna coordinates
-    test_url = "https://power.larc.nasa.gov/api/temporal/daily/point"
-    params = {
-        'parameters': 'T2M',
-        'community': 'AG',
-        'longitude': 7.44,
-        'latitude': 10.52,
-        'start': '20200101',
-        'end': '20200110',
-        'format': 'JSON'
-    }
-    
-    try:
-        print("Testing API with simple request...")
-        response = requests.get(test_url, params=params, timeout=30)
-        
-        print(f"Status Code: {response.status_code}")
-        
-        if response.status_code == 200:
-            data = response.json()
-            print("API is working!")
-            print(f"Data keys: {list(data.keys())}")
-            
-            if 'properties' in data and 'parameter' in data['properties']:
-                params = data['properties']['parameter']
-                print(f"Parameters returned: {list(params.keys())}")
-                
-                if 'T2M' in params:
-                    temp_data = params['T2M']
-                    print(f"Sample temperature data (first 5 days):")
-                    for i, (date, temp) in enumerate(list(temp_data.items())[:5]):
-                        print(f"  {date}: {temp}°C")
-                    
-                    return True
-        else:
-            print(f"API returned error: {response.status_code}")
-            print(f"Response: {response.text[:200]}")
-            return False
-            
-    except Exception as e:
-        print(f"Error testing API: {str(e)}")
-        return False
-
 # ============================================================================
 # MAIN EXECUTION
 # ============================================================================
 
-def main():
+def main(write_csv=False):
     """Main execution function"""
+    # Suppress warnings
+    warnings.filterwarnings('ignore')
+    
     try:
         # Print header
         print_header()
         
-        # Test NASA API first (optional)
-        print("Testing NASA POWER API connectivity...")
-        api_working = test_nasa_api()
-        
-        if not api_working:
-            print("\nWARNING: NASA POWER API test failed!")
-            print("   The script may not be able to download climate data.")
-            print("   Please check:")
-            print("   1. Your internet connection")
-            print("   2. NASA POWER API status (https://power.larc.nasa.gov/)")
-            print("   3. API parameters are correct")
-            
-            proceed = input("\nDo you want to continue anyway? (yes/no): ")
-            if proceed.lower() != 'yes':
-                print("Script terminated.")
-                return
-        
         # Create directories
         print("\nPreparing directories...")
         create_directories()
@@ -809,7 +894,11 @@ def main():
         co2_df = download_co2_data()
         
         # Download NASA POWER climate data
-        temp_df, rain_df, humid_df = collect_all_nasa_climate_data()
+        climate_tables = collect_all_nasa_climate_data(write_csv)
+        if climate_tables is None:
+            print("Script terminated.")
+            return
+        temp_df, rain_df, humid_df = climate_tables
         
         # Create FAO download instructions
         create_fao_download_instructions()
@@ -821,7 +910,7 @@ def main():
         print("\n" + "="*70)
         print("DOWNLOAD COMPLETE!")
         print("="*70)
-        print(f"\nAll files saved in: {Config.BASE_DIR}")
+        print(f"\nAll files saved in: {CFG.BASE_DIR}")
         print(f"Summary report: {summary_file}")
         
         print("\n" + "="*70)
@@ -846,12 +935,18 @@ def main():
         print("   If the problem persists, contact support")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download climate data for the project")
+    parser.add_argument('--csv', action='store_true',
+                        help="Also export climate tables as CSV (Parquet is always written)")
+    args = parser.parse_args()
+    
     # Check internet connectivity
     try:
         print("Checking internet connection...", end=" ")
-        requests.get("https://www.google.com", timeout=5)
+        # Single attempt - the retrying SESSION would delay the offline case
+        requests.head("https://www.google.com", timeout=5)
         print("Connected")
-        main()
+        main(write_csv=args.csv)
     except requests.exceptions.ConnectionError:
         print("No internet connection")
         print("Please connect to the internet and run the script again")
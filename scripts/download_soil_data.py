@@ -1,9 +1,14 @@
-import requests
+import asyncio
+import functools
+import aiohttp
+from aiolimiter import AsyncLimiter
 import pandas as pd
 import numpy as np
 from pathlib import Path
-import time
+import json
+import orjson
 import os
+import time
 from dotenv import load_dotenv
 
 # ============================================================================
@@ -26,6 +31,29 @@ if not USERNAME or not PASSWORD:
     )
 
 API_DOMAIN = "https://api.isda-africa.com"
+PROPERTY_URL = f"{API_DOMAIN}/isdasoil/v2/soilproperty"
+
+# Soil properties read from each iSDA response
+KEYS = (
+    "ph", "carbon_organic", "sand_content", "clay_content", "nitrogen_total",
+    "phosphorous_extractable", "potassium_extractable",
+    "cation_exchange_capacity", "bulk_density",
+)
+
+# Max in-flight requests; states are fetched concurrently
+MAX_CONCURRENT_REQUESTS = 8
+
+# iSDA publishes no quota; start property requests at 5 per second
+LIMITER = AsyncLimiter(max_rate=5, time_period=1)
+
+# Transient failures are retried with exponential backoff, honouring Retry-After
+MAX_RETRIES = 5
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+
+# Elevations never change; cache them on disk keyed by rounded (lat, lon)
+ELEVATION_CACHE_FILE = BASE_DIR / ".cache" / "elevation.json"
+ELEVATION_CACHE_TTL = 30 * 24 * 3600  # 30 days, in seconds
 
 LOCATIONS = [
     {"state": "Kaduna", "zone": "North-West", "lat": 10.52, "lon": 7.44},
@@ -52,32 +80,92 @@ LOCATIONS = [
 # 2. UTILITY FUNCTIONS
 # ============================================================================
 
-def get_elevation(lat, lon):
+def load_elevation_cache():
+    try:
+        with open(ELEVATION_CACHE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_elevation_cache():
+    ELEVATION_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(ELEVATION_CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump(_elev_cache, f, indent=2)
+
+
+_elev_cache = load_elevation_cache()
+
+
+async def _request_with_retry(session, method, url, limiter=None, **kw):
+    """HTTP request that retries 429/5xx responses and network errors; returns (status, JSON body or None)"""
+    for attempt in range(MAX_RETRIES + 1):
+        # Every attempt, retries included, takes a token from the limiter
+        if limiter is not None:
+            await limiter.acquire()
+        try:
+            async with session.request(method, url, **kw) as response:
+                if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                    if response.status != 200:
+                        return response.status, None
+                    return response.status, orjson.loads(await response.read())
+                retry_after = response.headers.get("Retry-After", "")
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if attempt == MAX_RETRIES:
+                raise
+            retry_after = ""
+
+        delay = float(retry_after) if retry_after.isdigit() else BACKOFF_FACTOR * 2 ** attempt
+        await asyncio.sleep(delay)
+
+
+async def get_elevation(session, lat, lon):
+    key = f"{round(lat, 3)},{round(lon, 3)}"
+    cached = _elev_cache.get(key)
+    if cached and time.time() - cached["ts"] < ELEVATION_CACHE_TTL:
+        return cached["elevation"]
+
     try:
         url = f"https://api.open-meteo.com/v1/elevation?latitude={lat}&longitude={lon}"
-        res = requests.get(url, timeout=10).json()
-        return res.get("elevation", [0])[0]
-    except:
+        _, res = await _request_with_retry(session, "GET", url, timeout=aiohttp.ClientTimeout(total=10))
+        elevation = res.get("elevation", [0])[0]
+    except Exception:
         return 0
 
+    _elev_cache[key] = {"elevation": elevation, "ts": time.time()}
+    return elevation
+
+
+TEXTURE_CLASSES = ["Sand", "Loamy Sand", "Sandy Clay Loam", "Sandy Clay", "Clay Loam", "Clay"]
+TEXTURE_WHC = [10, 15, 25, 35, 40, 45]
+
+
+def classify_texture(sand, clay):
+    """Vectorized texture classification; returns (labels, water holding capacity) arrays"""
+    sand = np.asarray(sand, dtype=float)
+    clay = np.asarray(clay, dtype=float)
+    silt = 100 - sand - clay
+
+    # Order matters: np.select takes the first matching condition, like the if-ladder
+    conditions = [
+        (sand >= 85) & (silt + 1.5 * clay < 15),
+        (sand >= 70) & (silt + 3 * clay < 30),
+        (clay >= 20) & (clay < 35) & (silt < 28) & (sand > 45),
+        (clay >= 35) & (sand > 45),
+        (clay >= 27) & (clay < 40) & (sand > 20) & (sand <= 45),
+        clay >= 40,
+    ]
+    labels = np.select(conditions, TEXTURE_CLASSES, default="Loam")
+    whc = np.select(conditions, TEXTURE_WHC, default=30)
+    return labels, whc
+
 
 def get_texture_class(sand, clay):
-    silt = 100 - (sand + clay)
-    if sand >= 85 and silt + 1.5 * clay < 15:
-        return "Sand", 10
-    if sand >= 70 and silt + 3 * clay < 30:
-        return "Loamy Sand", 15
-    if 20 <= clay < 35 and silt < 28 and sand > 45:
-        return "Sandy Clay Loam", 25
-    if clay >= 35 and sand > 45:
-        return "Sandy Clay", 35
-    if 27 <= clay < 40 and 20 < sand <= 45:
-        return "Clay Loam", 40
-    if clay >= 40:
-        return "Clay", 45
-    return "Loam", 30
+    labels, whc = classify_texture([sand], [clay])
+    return str(labels[0]), int(whc[0])
 
 
+@functools.lru_cache(maxsize=4096)
 def get_soil_type(ph):
     if ph < 5.5:
         return "Acidic"
@@ -86,37 +174,44 @@ def get_soil_type(ph):
     return "Ferruginous"
 
 
+@functools.lru_cache(maxsize=4096)
 def back_transform(value):
     if value is None:
         return 0.0
     return np.exp(value / 10.0) - 1.0
 
 
+def back_transform_vec(values):
+    """Vectorized back_transform; missing values (None/NaN) map to 0.0"""
+    values = np.asarray(values, dtype=float)
+    return np.where(np.isnan(values), 0.0, np.exp(values / 10.0) - 1.0)
+
+
+def parse_ph_vec(raw):
+    """Vectorized pH parsing; rescales x10/x100 readings, missing or non-positive values map to 6.0"""
+    raw = np.asarray(raw, dtype=np.float64)
+    out = np.where(raw <= 14, raw, np.where(raw <= 140, raw / 10.0, raw / 100.0))
+    out = np.where(np.isnan(raw) | (raw <= 0), 6.0, out)
+    return np.round(out, 2)
+
+
+@functools.lru_cache(maxsize=4096)
 def parse_ph(raw):
-    if raw is None:
-        return 6.0
     try:
         raw = float(raw)
-    except:
+    except (TypeError, ValueError):
         return 6.0
-
-    if 0 < raw <= 14:
-        return round(raw, 2)
-    if 14 < raw <= 140:
-        return round(raw / 10.0, 2)
-    if raw > 140:
-        return round(raw / 100.0, 2)
-    return 6.0
+    return float(parse_ph_vec(raw))
 
 # ============================================================================
 # 3. AUTHENTICATION
 # ============================================================================
 
-def get_access_token():
+async def get_access_token(session):
     print(f"Authenticating as {USERNAME}...")
     try:
-        response = requests.post(
-            f"{API_DOMAIN}/login",
+        status, payload = await _request_with_retry(
+            session, "POST", f"{API_DOMAIN}/login",
             data={
                 "username": USERNAME,
                 "password": PASSWORD
@@ -124,11 +219,12 @@ def get_access_token():
             headers={
                 "Content-Type": "application/x-www-form-urlencoded"
             },
-            timeout=15
+            timeout=aiohttp.ClientTimeout(total=15)
         )
-        response.raise_for_status()
+        if payload is None:
+            raise ValueError(f"HTTP {status}")
 
-        token = response.json().get("access_token")
+        token = payload.get("access_token")
         if not token:
             raise ValueError("No access_token returned")
 
@@ -141,78 +237,99 @@ def get_access_token():
 # 4. MAIN PROCESSING
 # ============================================================================
 
-def main():
-    token = get_access_token()
-    if not token:
-        return
-
-    headers = {"Authorization": f"Bearer {token}"}
-    prop_url = f"{API_DOMAIN}/isdasoil/v2/soilproperty"
-    final_data = []
-
-    print("\nProcessing Nigerian State Soil Profiles...\n")
-
-    for loc in LOCATIONS:
-        print(f"→ {loc['state']}...", end=" ", flush=True)
-
-        elevation = get_elevation(loc["lat"], loc["lon"])
-
+async def process_location(session, semaphore, loc, elevation, headers):
+    async with semaphore:
+        # Network failures only drop this state; anything else (e.g. a malformed
+        # payload) propagates so the TaskGroup cancels the remaining states
         try:
             params = {"lat": loc["lat"], "lon": loc["lon"], "depth": "0-20"}
-            response = requests.get(
-                prop_url, headers=headers, params=params, timeout=20
+            status, payload = await _request_with_retry(
+                session, "GET", PROPERTY_URL, limiter=LIMITER, headers=headers, params=params,
+                timeout=aiohttp.ClientTimeout(total=20)
             )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"→ {loc['state']}... ✗ Error: {e}")
+            return None
+
+        if payload is None:
+            print(f"→ {loc['state']}... ✗ (HTTP {status})")
+            return None
+
+        data = payload.get("property", {})
+
+        extracted = {k: (data.get(k) or [{}])[0].get("value", {}).get("value") for k in KEYS}
+
+        ph_val = parse_ph(extracted["ph"])
+        soc_g_kg = back_transform(extracted["carbon_organic"])
+        sand_pct = extracted["sand_content"] or 50
+        clay_pct = extracted["clay_content"] or 20
+
+        texture, whc = get_texture_class(sand_pct, clay_pct)
+
+        row = {
+            "Geopolitical_Zone": loc["zone"],
+            "State": loc["state"],
+            "Latitude": loc["lat"],
+            "Longitude": loc["lon"],
+            "Elevation_m": elevation,
+            "Soil_Type": get_soil_type(ph_val),
+            "Soil_Texture": texture,
+            "Soil_pH": ph_val,
+            "Organic_Matter_Percent": round((soc_g_kg / 10.0) * 1.724, 2),
+            "Nitrogen_ppm": round(back_transform(extracted["nitrogen_total"]) * 1000, 1),
+            "Phosphorus_ppm": round(back_transform(extracted["phosphorous_extractable"]), 1),
+            "Potassium_ppm": round(extracted["potassium_extractable"] or 0.0, 1),
+            "Cation_Exchange_Capacity": round((extracted["cation_exchange_capacity"] or 100) / 10.0, 1),
+            "Bulk_Density": round((extracted["bulk_density"] or 140) / 100.0, 2),
+            "Water_Holding_Capacity_Percent": whc,
+        }
+
+        print(f"→ {loc['state']}... ✓")
+        return row
+
+
+async def main():
+    connector = aiohttp.TCPConnector(limit=10)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        # Elevation lookups need no token, so they run while we log in
+        async with asyncio.TaskGroup() as tg:
+            token_task = tg.create_task(get_access_token(session))
+            elevation_tasks = [
+                tg.create_task(get_elevation(session, loc["lat"], loc["lon"]))
+                for loc in LOCATIONS
+            ]
+
+        save_elevation_cache()
+
+        token = token_task.result()
+        if not token:
+            return
+
+        headers = {"Authorization": f"Bearer {token}"}
+
+        print("\nProcessing Nigerian State Soil Profiles...\n")
+
+        # The semaphore caps in-flight states; no fixed sleeps between requests
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(process_location(session, semaphore, loc, t.result(), headers))
+                for loc, t in zip(LOCATIONS, elevation_tasks)
+            ]
 
-            if response.status_code != 200:
-                print(f"✗ (HTTP {response.status_code})")
-                continue
-
-            data = response.json().get("property", {})
-
-            def gv(k):
-                try:
-                    return data[k][0]["value"]["value"]
-                except:
-                    return None
-
-            ph_val = parse_ph(gv("ph"))
-            soc_g_kg = back_transform(gv("carbon_organic"))
-            sand_pct = gv("sand_content") or 50
-            clay_pct = gv("clay_content") or 20
-
-            texture, whc = get_texture_class(sand_pct, clay_pct)
-
-            final_data.append({
-                "Geopolitical_Zone": loc["zone"],
-                "State": loc["state"],
-                "Latitude": loc["lat"],
-                "Longitude": loc["lon"],
-                "Elevation_m": elevation,
-                "Soil_Type": get_soil_type(ph_val),
-                "Soil_Texture": texture,
-                "Soil_pH": ph_val,
-                "Organic_Matter_Percent": round((soc_g_kg / 10.0) * 1.724, 2),
-                "Nitrogen_ppm": round(back_transform(gv("nitrogen_total")) * 1000, 1),
-                "Phosphorus_ppm": round(back_transform(gv("phosphorous_extractable")), 1),
-                "Potassium_ppm": round(gv("potassium_extractable") or 0.0, 1),
-                "Cation_Exchange_Capacity": round((gv("cation_exchange_capacity") or 100) / 10.0, 1),
-                "Bulk_Density": round((gv("bulk_density") or 140) / 100.0, 2),
-                "Water_Holding_Capacity_Percent": whc,
-            })
-
-            print("✓")
-            time.sleep(1)
-
-        except Exception as e:
-            print(f"✗ Error: {e}")
+    # tasks are in LOCATIONS order, so the output rows stay in state order
+    final_data = [row for row in (t.result() for t in tasks) if row is not None]
 
     if final_data:
         df = pd.DataFrame(final_data)
         output_file = BASE_DIR / "nigeria_soil_complete.csv"
         df.to_csv(output_file, index=False)
-        print(f"\nSUCCESS: Data saved to {output_file}")
+        # Typed, columnar copy for downstream readers
+        parquet_file = output_file.with_suffix(".parquet")
+        df.to_parquet(parquet_file, compression="zstd", engine="pyarrow", index=False)
+        print(f"\nSUCCESS: Data saved to {output_file} and {parquet_file.name}")
     else:
         print("\nNo data collected.")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())